@@ -1,20 +1,93 @@
 import streamlit as st
 import openai
+import atexit
+import html
+import itertools
+import mimetypes
 import os
 import re
+import shutil
+import subprocess
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
+import diskcache
+import httpx
+import imageio_ffmpeg
+import tiktoken
 import yt_dlp
 from dotenv import load_dotenv
 
+try:
+    # Optional: google-re2 matches in linear time without backtracking
+    import re2 as url_re
+except ImportError:
+    url_re = re
+
 load_dotenv('.env')
 
+# Persistent cache for transcripts and summaries, keyed by YouTube video ID
+CACHE_DIR = ".cache"
+CACHE_TTL = 86400  # seconds
+SUMMARY_MODEL = "gpt-4o-mini"
+TRANSCRIPTION_MODEL = "gpt-4o-mini-transcribe"
+
+# Models offered in the sidebar; the first entry is the default
+SUMMARY_MODELS = [SUMMARY_MODEL, "gpt-4o"]
+TRANSCRIPTION_MODELS = [TRANSCRIPTION_MODEL, "whisper-1", "gpt-4o-transcribe"]
+
+# Kept constant so the system prompt + transcript form a cacheable prompt prefix
+SUMMARY_SYSTEM_PROMPT = "You are a helpful assistant that summarizes YouTube video transcripts. Provide a concise summary with key points and main takeaways."
+
+# Transcripts over the token budget are summarized in windows, then combined
+MAX_TRANSCRIPT_TOKENS = 120_000
+SUMMARY_WINDOW_TOKENS = 8_000
+SUMMARY_WINDOW_WORDS = 200
+SUMMARY_WORKERS = 8
+# Rough English average, used when tiktoken's encoding files can't be loaded
+CHARS_PER_TOKEN = 4
+
+# Long audio is split into chunks that are transcribed in parallel
+CHUNK_SECONDS = 60
+TRANSCRIBE_WORKERS = 8
+# OpenAI rejects audio under 0.1s, so never leave a shorter trailing chunk
+MIN_CHUNK_SECONDS = 1
+# Chunks are cut at the latest pause within this many seconds of the target
+# length, so words are not split across chunks
+SILENCE_SEARCH_SECONDS = 15
+SILENCE_FILTER = "silencedetect=noise=-30dB:d=0.3"
+
+FFMPEG_DURATION_RE = re.compile(r'Duration: (\d+):(\d{2}):(\d{2}(?:\.\d+)?)')
+FFMPEG_TIME_RE = re.compile(r'time=(\d+):(\d{2}):(\d{2}(?:\.\d+)?)')
+FFMPEG_SILENCE_RE = re.compile(r'silence_start: (-?[\d.]+)[\s\S]*?silence_end: ([\d.]+)')
+
+# Matches watch, embed, shorts and youtu.be URLs; video IDs are 11 base64url characters
+VIDEO_ID_RE = url_re.compile(r'(?:youtube\.com/(?:watch\?(?:[^&]*&)*v=|embed/|v/|shorts/)|youtu\.be/)([A-Za-z0-9_-]{11})')
+
+# Audio-only format selection, shared by the caption lookup so its info can
+# be reused for the download without carrying a video format selection
+YDL_AUDIO_FORMAT = 'bestaudio[ext=m4a]/bestaudio/best'
+
+# Browser user agent sent to YouTube to avoid 403 errors
+YDL_HTTP_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+}
+
+# Caption languages tried before falling back to Whisper, in order of preference
+CAPTION_LANGUAGES = ['en', 'en-US']
+VTT_TAG_RE = re.compile(r'<[^>]+>')
+
+WORD_RE = re.compile(r'\S+')
+SENTENCE_RE = re.compile(r'(.+?)(?:\. |$)', re.DOTALL)
+
 # Function to get API key from Streamlit secrets or environment
+# Cached because the configured key cannot change while the app is running
+@st.cache_resource(show_spinner=False)
 def get_openai_api_key():
     """Get OpenAI API key from Streamlit secrets or environment variables"""
     try:
         # Try Streamlit secrets first (for cloud deployment)
         return st.secrets["OPENAI_API_KEY"]
-    except Exception:
+    except (FileNotFoundError, KeyError, AttributeError):
         # Fallback to environment variable
         return os.getenv("OPENAI_API_KEY")
 
@@ -26,77 +99,256 @@ st.set_page_config(
 
 def extract_video_id(url):
     """Extract video ID from various YouTube URL formats"""
-    patterns = [
-        r'(?:youtube\.com/watch\?v=|youtu\.be/|youtube\.com/embed/)([^&\n?#]+)',
-        r'youtube\.com/watch\?.*v=([^&\n?#]+)'
-    ]
+    match = VIDEO_ID_RE.search(url)
+    return match.group(1) if match else None
+
+# Bounded so keys typed into the sidebar don't each keep a client alive forever
+@st.cache_resource(max_entries=8, show_spinner=False)
+def get_openai_client(api_key):
+    """
+    Get an OpenAI client shared across reruns and sessions.
     
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
+    Reusing one client keeps its HTTP/2 connection pool alive, so Whisper and
+    chat requests skip repeated TCP/TLS handshakes.
     
-    return None
+    Args:
+        api_key (str): OpenAI API key the client authenticates with
+        
+    Returns:
+        openai.OpenAI: Client for the given API key
+    """
+    return openai.OpenAI(
+        api_key=api_key,
+        # DefaultHttpxClient keeps the SDK's defaults such as timeouts and
+        # redirect following
+        http_client=openai.DefaultHttpxClient(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=16)
+        )
+    )
+
+@st.cache_resource(show_spinner=False)
+def get_cache():
+    """Get the on-disk cache shared by all sessions"""
+    return diskcache.Cache(CACHE_DIR)
 
-def extract_audio_from_youtube(url):
+@st.cache_resource(show_spinner=False)
+def get_token_encoding(model=SUMMARY_MODEL):
+    """
+    Get the tiktoken encoding for a model, loaded once per process.
+    
+    tiktoken downloads its encoding files on first use. A failed load is
+    cached as None too, so token counts fall back to estimates instead of
+    every summary retrying the download.
+    """
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+
+@st.cache_resource(show_spinner=False)
+def get_scratch_root():
+    """Get the parent of all sessions' scratch directories, removed at exit"""
+    scratch_root = tempfile.mkdtemp(prefix="yt_")
+    atexit.register(shutil.rmtree, scratch_root, ignore_errors=True)
+    return scratch_root
+
+def get_scratch_dir():
+    """
+    Get this session's scratch directory, creating it on first use.
+    
+    Downloads and audio chunks reuse the same directory on every run instead
+    of allocating new temporary directories. Its contents are removed with
+    clear_scratch_dir after each run, and the directory itself when the
+    process exits.
+    
+    Returns:
+        str: Path of the session's scratch directory
+    """
+    if "scratch_dir" not in st.session_state:
+        st.session_state.scratch_dir = tempfile.mkdtemp(dir=get_scratch_root())
+    return st.session_state.scratch_dir
+
+def clear_scratch_dir(scratch_dir):
+    """Delete the files and folders in a scratch directory, keeping the directory"""
+    for entry in os.listdir(scratch_dir):
+        path = os.path.join(scratch_dir, entry)
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            os.unlink(path)
+
+def transcript_cache_key(video_id, transcription_model=None):
+    """Build the cache key for a video's transcript (model is None for captions)"""
+    return ("transcript", video_id, transcription_model)
+
+def summary_cache_key(video_id, max_length, model=SUMMARY_MODEL, transcription_model=None):
+    """Build the cache key for a video's summary of a given transcript"""
+    return ("summary", video_id, max_length, model, transcription_model)
+
+def parse_vtt(vtt_text):
+    """
+    Convert WebVTT captions to plain transcript text.
+    
+    Drops the header, cue identifiers, cue timings and inline tags, and skips
+    lines repeated by YouTube's rolling auto-generated captions.
+    
+    Args:
+        vtt_text (str): Caption file contents in WebVTT format
+        
+    Returns:
+        str: Caption text joined into a single transcript
+    """
+    raw_lines = [line.strip() for line in vtt_text.splitlines()]
+    lines = []
+    for index, line in enumerate(raw_lines):
+        if not line or line == "WEBVTT" or "-->" in line or line.startswith(("Kind:", "Language:", "NOTE")):
+            continue
+        
+        # A line directly above a cue timing line is the cue's identifier
+        if index + 1 < len(raw_lines) and "-->" in raw_lines[index + 1]:
+            continue
+        
+        text = html.unescape(VTT_TAG_RE.sub("", line)).strip()
+        if text and (not lines or text != lines[-1]):
+            lines.append(text)
+    
+    return " ".join(lines)
+
+def get_youtube_captions(url):
+    """
+    Fetch the transcript from a video's YouTube captions.
+    
+    Looks up creator or auto-generated captions with yt-dlp without
+    downloading the video and converts the VTT file to plain text. This is
+    far faster and cheaper than downloading audio for Whisper. Auto-generated
+    captions are only used when the video is spoken in English, since
+    YouTube otherwise serves a machine translation. The extracted video
+    information is returned too, so a fallback audio download can reuse it
+    instead of extracting the video again.
+    
+    Args:
+        url (str): YouTube video URL
+        
+    Returns:
+        tuple: (caption text or None if no captions are available,
+            yt-dlp video info dict or None if extraction failed)
+    """
+    info = None
+    try:
+        ydl_opts = {
+            'format': YDL_AUDIO_FORMAT,
+            'skip_download': True,
+            'writesubtitles': True,
+            'writeautomaticsub': True,
+            'subtitleslangs': CAPTION_LANGUAGES,
+            'subtitlesformat': 'vtt',
+            'quiet': True,
+            'no_warnings': True,
+            'http_headers': YDL_HTTP_HEADERS,
+        }
+        
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(url, download=False)
+        
+        info = info or {}
+        subtitles = info.get('requested_subtitles') or {}
+        manual_languages = info.get('subtitles') or {}
+        # Automatic captions of non-English videos are machine translations
+        # of the original speech, so Whisper on the audio is preferred
+        spoken_english = (info.get('language') or '').startswith('en')
+        for language in CAPTION_LANGUAGES:
+            subtitle = subtitles.get(language)
+            if not (language in manual_languages or spoken_english):
+                continue
+            if subtitle and subtitle.get('url'):
+                response = httpx.get(subtitle['url'], timeout=30)
+                response.raise_for_status()
+                return parse_vtt(response.text) or None, info
+        
+        return None, info
+    except Exception:
+        # Captions are only a fast path; fall back to audio transcription
+        return None, info
+
+def extract_audio_from_youtube(url, output_dir, progress_callback=None, info=None):
     """
     Extract audio from YouTube video using yt-dlp.
     
-    Downloads the best available audio format from a YouTube video and returns
-    the audio data as bytes. Uses temporary files for processing and includes
-    error handling for common YouTube access issues.
+    Downloads the best available audio format from a YouTube video into
+    output_dir and returns the path of the downloaded file, so the audio is
+    never held in memory. Includes error handling for common YouTube access
+    issues.
     
     Args:
         url (str): YouTube video URL
+        output_dir (str): Directory the audio file is downloaded into
+        progress_callback (callable, optional): Called with the download
+            progress as a float between 0.0 and 1.0
+        info (dict, optional): Video info already extracted by yt-dlp, which
+            is reused instead of extracting the video again
         
     Returns:
-        bytes or None: Audio data in binary format, or None if extraction fails
+        str or None: Path of the downloaded audio file, or None if extraction fails
     """
     try:
-        with tempfile.TemporaryDirectory() as temp_dir:
-            audio_path = os.path.join(temp_dir, "audio.%(ext)s")
-            
-            ydl_opts = {
-                'format': 'bestaudio[ext=m4a]/bestaudio/best',
-                'outtmpl': audio_path,
-                # Remove postprocessors since we don't have ffmpeg
-                # We'll work with the original M4A format
-                'quiet': True,
-                'no_warnings': True,
-                # Add user agent and other headers to avoid 403 errors
-                'http_headers': {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                },
-                # Try to avoid rate limiting
-                'sleep_interval': 1,
-                'max_sleep_interval': 5,
-                # Use cookies if available
-                'cookiefile': None,
-                # Extract info first to check availability
-                'extract_flat': False,
-            }
-            
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                try:
-                    # First, try to extract info to check if video is available
-                    info = ydl.extract_info(url, download=False)
-                    if not info:
-                        raise Exception("Could not extract video information")
-                    
-                    # Now download the audio
-                    ydl.download([url])
-                except yt_dlp.utils.DownloadError as e:
-                    raise Exception(f"Download failed: {str(e)}")
+        audio_path = os.path.join(output_dir, "audio.%(ext)s")
+        
+        ydl_opts = {
+            'format': YDL_AUDIO_FORMAT,
+            'outtmpl': audio_path,
+            # The output directory is reused across runs, so replace old audio
+            'overwrites': True,
+            # No postprocessors: split_audio transcodes for Whisper
+            # while chunking, so keep the original download format
+            'quiet': True,
+            'no_warnings': True,
+            # Add user agent and other headers to avoid 403 errors
+            'http_headers': YDL_HTTP_HEADERS,
+            # Download DASH fragments in parallel and retry transient failures
+            'concurrent_fragment_downloads': 8,
+            'http_chunk_size': 10485760,
+            'retries': 3,
+            'fragment_retries': 3,
+            # Use cookies if available
+            'cookiefile': None,
+            # Extract info first to check availability
+            'extract_flat': False,
+        }
+        
+        if progress_callback:
+            def progress_hook(d):
+                total = d.get('total_bytes') or d.get('total_bytes_estimate')
+                if d['status'] == 'downloading' and total:
+                    progress_callback(min(d.get('downloaded_bytes', 0) / total, 1.0))
+                elif d['status'] == 'finished':
+                    progress_callback(1.0)
             
-            # Find the actual audio file (yt-dlp might add extension)
-            for file in os.listdir(temp_dir):
-                if file.endswith(('.mp3', '.m4a', '.webm', '.opus')):
-                    audio_file_path = os.path.join(temp_dir, file)
-                    # Read the audio file and return its content
-                    with open(audio_file_path, 'rb') as f:
-                        return f.read()
+            ydl_opts['progress_hooks'] = [progress_hook]
+        
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            try:
+                if info:
+                    # Select and download the audio from the existing info
+                    info = ydl.process_ie_result(info, download=True)
+                else:
+                    # Extract info and download the audio in a single pass
+                    info = ydl.extract_info(url, download=True)
+                if not info:
+                    raise Exception("Could not extract video information")
+            except yt_dlp.utils.DownloadError as e:
+                raise Exception(f"Download failed: {str(e)}")
             
-            return None
+            # Use the path yt-dlp reports rather than scanning the directory
+            downloads = info.get('requested_downloads') or []
+            audio_file_path = downloads[0].get('filepath') if downloads else None
+            if not audio_file_path:
+                audio_file_path = ydl.prepare_filename(info)
+        
+        return audio_file_path if os.path.exists(audio_file_path) else None
     except Exception as e:
         st.error(f"Error extracting audio: {str(e)}")
         # Show more specific error message
@@ -108,81 +360,397 @@ def extract_audio_from_youtube(url):
             st.write("- Try a different video or check if the video is publicly accessible")
         return None
 
-def transcribe_audio(audio_data):
+def probe_audio(audio_path):
+    """
+    Decode an audio file once to measure its duration and find pauses.
+    
+    Uses the container's reported duration, falling back to the last
+    timestamp ffmpeg reached while decoding when the container has none.
+    Pauses come from ffmpeg's silencedetect filter.
+    
+    Args:
+        audio_path (str): Path to the audio file
+        
+    Returns:
+        tuple: (duration in seconds, list of pause midpoints in seconds)
+        
+    Raises:
+        subprocess.CalledProcessError: If ffmpeg cannot decode the file
+        ValueError: If no duration can be determined
+    """
+    command = [
+        imageio_ffmpeg.get_ffmpeg_exe(),
+        "-hide_banner", "-nostdin",
+        "-i", audio_path,
+        "-vn",
+        "-af", SILENCE_FILTER,
+        "-f", "null", "-",
+    ]
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise subprocess.CalledProcessError(result.returncode, command, stderr=result.stderr)
+    
+    match = FFMPEG_DURATION_RE.search(result.stderr)
+    if match:
+        hours, minutes, seconds = match.groups()
+    else:
+        # No duration in the container; use the last decoded timestamp
+        timestamps = FFMPEG_TIME_RE.findall(result.stderr)
+        if not timestamps:
+            raise ValueError(f"Could not determine the duration of {audio_path}")
+        hours, minutes, seconds = timestamps[-1]
+    
+    duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    
+    silences = [
+        (float(start) + float(end)) / 2
+        for start, end in FFMPEG_SILENCE_RE.findall(result.stderr)
+    ]
+    return duration, silences
+
+def plan_chunk_boundaries(duration, silences, chunk_seconds=CHUNK_SECONDS, min_chunk_seconds=MIN_CHUNK_SECONDS):
     """
-    Transcribe audio using OpenAI Whisper API.
+    Choose the times at which to cut audio into chunks.
     
-    Takes binary audio data and converts it to text using OpenAI's Whisper model.
-    Creates a temporary file for the audio data during processing and handles
-    cleanup automatically.
+    Each cut falls on the latest pause within SILENCE_SEARCH_SECONDS before
+    the target chunk length, so words are not split between chunks. Without
+    a nearby pause the cut falls at the target length. No cut is made that
+    would leave a trailing chunk shorter than min_chunk_seconds, so that
+    tail is merged into the previous chunk instead.
     
     Args:
-        audio_data (bytes): Binary audio data to transcribe
+        duration (float): Audio duration in seconds
+        silences (list): Pause midpoints in seconds
+        chunk_seconds (int): Target length of each chunk in seconds
+        min_chunk_seconds (float): Shortest allowed final chunk in seconds
+        
+    Returns:
+        list: Cut times in seconds, in increasing order
+    """
+    boundaries = []
+    last_cut = 0
+    while duration - (last_cut + chunk_seconds) >= min_chunk_seconds:
+        target = last_cut + chunk_seconds
+        pauses = [pause for pause in silences if target - SILENCE_SEARCH_SECONDS <= pause <= target]
+        last_cut = max(pauses) if pauses else target
+        boundaries.append(last_cut)
+    return boundaries
+
+def split_audio(audio_path, output_dir, chunk_seconds=CHUNK_SECONDS):
+    """
+    Split an audio file at pauses into chunks compressed for Whisper.
+    
+    Chunks are up to chunk_seconds long and end on a pause where possible.
+    Uses ffmpeg's segment muxer to transcode to 16 kHz mono Opus while
+    splitting. Whisper resamples to 16 kHz mono internally, so this only
+    shrinks the upload, typically by 5-20x. Chunks are yielded as soon as
+    ffmpeg finishes writing them, so callers can start transcribing before
+    the whole file is processed. Short files produce a single chunk, and a
+    short tail is merged into the last chunk.
+    
+    Args:
+        audio_path (str): Path to the audio file to split
+        output_dir (str): Directory the chunk files are written to
+        chunk_seconds (int): Target length of each chunk in seconds
+        
+    Yields:
+        tuple: (path of each finished chunk file, the chunk's end offset in
+            seconds, or None for the final chunk), in playback order
+        
+    Raises:
+        subprocess.CalledProcessError: If ffmpeg fails
+    """
+    chunk_pattern = os.path.join(output_dir, "chunk_%03d.ogg")
+    
+    # Drop chunks left over from a previous, possibly longer, recording
+    os.makedirs(output_dir, exist_ok=True)
+    for file in os.listdir(output_dir):
+        if file.startswith("chunk_"):
+            os.unlink(os.path.join(output_dir, file))
+    
+    duration, silences = probe_audio(audio_path)
+    boundaries = plan_chunk_boundaries(duration, silences, chunk_seconds)
+    chunk_ends = iter(boundaries)
+    
+    command = [
+        imageio_ffmpeg.get_ffmpeg_exe(),
+        "-hide_banner", "-loglevel", "error",
+        "-i", audio_path,
+        "-vn",
+        "-ac", "1",
+        "-ar", "16000",
+        "-c:a", "libopus",
+        "-b:a", "16k",
+        "-f", "segment",
+        # A single cut past the end leaves the whole file as one chunk
+        "-segment_times", ",".join(f"{cut:.3f}" for cut in boundaries or [duration + chunk_seconds]),
+        "-reset_timestamps", "1",
+        # Print each chunk's filename to stdout once it is complete
+        "-segment_list", "pipe:1",
+        "-segment_list_type", "flat",
+        chunk_pattern,
+    ]
+    
+    with subprocess.Popen(command, stdout=subprocess.PIPE, text=True) as process:
+        for line in process.stdout:
+            if line.strip():
+                yield os.path.join(output_dir, os.path.basename(line.strip())), next(chunk_ends, None)
+    
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, command)
+
+def extract_audio_remainder(audio_path, start, output_dir):
+    """
+    Copy the part of an audio file after a given offset into a new file.
+    
+    Used when splitting fails partway, so only the audio that no chunk
+    covered is uploaded again. The stream is copied without re-encoding.
+    
+    Args:
+        audio_path (str): Path to the audio file
+        start (float): Offset in seconds where the remainder starts
+        output_dir (str): Directory the remainder file is written to
+        
+    Returns:
+        str: Path of the remainder file
+        
+    Raises:
+        subprocess.CalledProcessError: If ffmpeg fails
+    """
+    _, ext = os.path.splitext(audio_path)
+    remainder_path = os.path.join(output_dir, f"remainder{ext}")
+    subprocess.run(
+        [
+            imageio_ffmpeg.get_ffmpeg_exe(),
+            "-y", "-hide_banner", "-loglevel", "error",
+            "-ss", f"{start:.3f}",
+            "-i", audio_path,
+            "-vn",
+            "-c", "copy",
+            remainder_path,
+        ],
+        check=True,
+    )
+    return remainder_path
+
+def transcribe_chunk(client, chunk_path, model=TRANSCRIPTION_MODEL):
+    """Transcribe a single audio file with an OpenAI speech-to-text model"""
+    content_type = mimetypes.guess_type(chunk_path)[0] or "application/octet-stream"
+    with open(chunk_path, 'rb') as audio_file:
+        # Hand the open file to the multipart encoder so it is streamed from
+        # disk; plain text output skips serializing unused timestamps
+        return client.audio.transcriptions.create(
+            model=model,
+            file=(os.path.basename(chunk_path), audio_file, content_type),
+            response_format="text"
+        )
+
+def transcribe_audio(audio_path, api_key, model=TRANSCRIPTION_MODEL):
+    """
+    Transcribe audio using OpenAI's transcription API.
+    
+    Takes an audio file and converts it to text using an OpenAI speech-to-text
+    model (gpt-4o-mini-transcribe by default, or Whisper).
+    The audio is split into chunks that are transcribed concurrently as they
+    are produced, so wall time grows with chunk length rather than total
+    duration. Falls back to a single request if the audio cannot be split; if
+    splitting fails partway, only the audio after the last chunk is re-sent.
+    
+    Args:
+        audio_path (str): Path of the audio file to transcribe
+        api_key (str): OpenAI API key
+        model (str): Transcription model (default: gpt-4o-mini-transcribe)
         
     Returns:
         str or None: Transcribed text, or None if transcription fails
     """
     try:
-        client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        client = get_openai_client(api_key)
         
-        # Create a temporary file for the audio data
-        # Use M4A format since that's what we're getting from YouTube
-        with tempfile.NamedTemporaryFile(suffix='.m4a', delete=False) as temp_file:
-            temp_file.write(audio_data)
-            temp_file_path = temp_file.name
-        
-        try:
-            # Open the temporary file for transcription
-            with open(temp_file_path, 'rb') as audio_file:
-                transcript = client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file,
-                    response_format="text"
-                )
+        # Chunks are written next to the audio file, reusing its directory
+        chunk_dir = os.path.join(os.path.dirname(audio_path), "chunks")
+        with ThreadPoolExecutor(max_workers=TRANSCRIBE_WORKERS) as executor:
+            # Start transcribing each chunk as soon as ffmpeg finishes it, so
+            # transcoding and transcription overlap
+            futures = []
+            transcribed_until = 0
+            try:
+                for chunk_path, chunk_end in split_audio(audio_path, chunk_dir):
+                    futures.append(executor.submit(transcribe_chunk, client, chunk_path, model))
+                    transcribed_until = chunk_end
+            except (RuntimeError, OSError, ValueError, subprocess.CalledProcessError):
+                if futures and transcribed_until is not None:
+                    # Keep the chunks already sent and upload only the audio after them
+                    remainder_path = extract_audio_remainder(audio_path, transcribed_until, chunk_dir)
+                    futures.append(executor.submit(transcribe_chunk, client, remainder_path, model))
             
-            return transcript
-        finally:
-            # Clean up temporary file
-            os.unlink(temp_file_path)
+            if not futures:
+                futures = [executor.submit(transcribe_chunk, client, audio_path, model)]
+            
+            # Collect results in submission order to preserve chunk order
+            transcripts = [future.result() for future in futures]
+        
+        return " ".join(transcript.strip() for transcript in transcripts)
             
     except Exception as e:
         st.error(f"Error transcribing audio: {str(e)}")
         return None
 
-def summarize_text(text, max_length=500):
+def build_summary_messages(text, max_length):
+    """
+    Build the chat messages asking for a summary of a transcript.
+    
+    The transcript goes before the length instruction so repeated requests
+    for the same video share a prefix and hit OpenAI's prompt cache.
+    
+    Args:
+        text (str): Transcript text to summarize
+        max_length (int): Target length for summary in words
+        
+    Returns:
+        list: Chat completion messages
+    """
+    return [
+        {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+        {"role": "user", "content": f"<transcript>\n{text}\n</transcript>"},
+        {"role": "user", "content": f"Please summarize this YouTube video transcript in about {max_length} words."}
+    ]
+
+def build_combine_messages(section_summaries, max_length):
+    """
+    Build the chat messages asking to merge section summaries into one.
+    
+    Used for the reduce step of long transcripts, whose input is a series of
+    summaries of consecutive sections rather than a transcript.
+    
+    Args:
+        section_summaries (str): Summaries of consecutive transcript sections
+        max_length (int): Target length for summary in words
+        
+    Returns:
+        list: Chat completion messages
+    """
+    return [
+        {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+        {"role": "user", "content": f"<section_summaries>\n{section_summaries}\n</section_summaries>"},
+        {"role": "user", "content": f"These are summaries of consecutive sections of one YouTube video transcript, in order. Combine them into a single summary of the whole video in about {max_length} words."}
+    ]
+
+def split_into_token_windows(text, window_tokens, encoding=None, tokens=None):
+    """
+    Split text into consecutive windows of at most window_tokens tokens.
+    
+    Special-token markers such as <|endoftext|> in the text are counted as
+    ordinary text. Without an encoding, tokens are estimated as
+    CHARS_PER_TOKEN characters each.
+    
+    Args:
+        text (str): Text to split
+        window_tokens (int): Maximum tokens per window
+        encoding (tiktoken.Encoding, optional): Tokenizer for the model
+        tokens (list, optional): text already encoded with encoding, which
+            is reused instead of encoding it again
+        
+    Returns:
+        list: Windows of text in order; a single window if text fits
+    """
+    if encoding is None:
+        window_chars = window_tokens * CHARS_PER_TOKEN
+        return [text[start:start + window_chars] for start in range(0, len(text), window_chars)] or [text]
+    
+    if tokens is None:
+        tokens = encoding.encode_ordinary(text)
+    return [
+        encoding.decode(tokens[start:start + window_tokens])
+        for start in range(0, len(tokens), window_tokens)
+    ] or [text]
+
+def summarize_window(client, text, model=SUMMARY_MODEL):
+    """Summarize one window of a long transcript without streaming"""
+    response = client.chat.completions.create(
+        model=model,
+        messages=build_summary_messages(text, SUMMARY_WINDOW_WORDS),
+        temperature=0.7
+    )
+    return response.choices[0].message.content
+
+def summarize_text(text, api_key, max_length=500, model=SUMMARY_MODEL):
     """
-    Summarize text using OpenAI GPT-3.5-turbo.
+    Summarize text using an OpenAI GPT model, streaming the result.
     
     Takes a text string and generates a concise summary using OpenAI's GPT model.
-    Automatically truncates overly long input text to stay within token limits.
+    Transcripts longer than MAX_TRANSCRIPT_TOKENS are split into token windows
+    that are summarized in parallel, and the final summary is generated from
+    those partial summaries with a dedicated combine prompt. The transcript
+    is sent ahead of the length instruction so that repeated summaries of
+    the same video reuse OpenAI's cached prompt prefix.
     
     Args:
         text (str): Text to summarize
+        api_key (str): OpenAI API key
         max_length (int): Target length for summary in words (default: 500)
+        model (str): Chat model used for summarization (default: gpt-4o-mini)
         
-    Returns:
-        str: Generated summary, or error message if summarization fails
+    Yields:
+        str: Pieces of the summary as they are generated
+        
+    Raises:
+        openai.OpenAIError: If the summarization request fails
     """
-    try:
-        client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        
-        # Truncate text if too long (GPT has token limits)
-        if len(text) > 15000:
-            text = text[:15000] + "..."
-        
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant that summarizes YouTube video transcripts. Provide a concise summary with key points and main takeaways."},
-                {"role": "user", "content": f"Please summarize this YouTube video transcript in about {max_length} words:\n\n{text}"}
-            ],
-            max_tokens=max_length + 100,
-            temperature=0.7
-        )
+    client = get_openai_client(api_key)
+    encoding = get_token_encoding(model)
+    
+    messages = build_summary_messages(text, max_length)
+    if encoding is None:
+        tokens = None
+        too_long = len(text) > MAX_TRANSCRIPT_TOKENS * CHARS_PER_TOKEN
+    else:
+        tokens = encoding.encode_ordinary(text)
+        too_long = len(tokens) > MAX_TRANSCRIPT_TOKENS
+    
+    if too_long:
+        # Map-reduce: summarize each window in parallel, then summarize the summaries
+        windows = split_into_token_windows(text, SUMMARY_WINDOW_TOKENS, encoding, tokens)
+        with ThreadPoolExecutor(max_workers=SUMMARY_WORKERS) as executor:
+            partial_summaries = list(executor.map(lambda window: summarize_window(client, window, model), windows))
         
-        return response.choices[0].message.content
-    except Exception as e:
-        return f"Error summarizing text: {str(e)}"
+        # Truncate text if still too long (GPT has token limits)
+        section_summaries = split_into_token_windows("\n\n".join(partial_summaries), MAX_TRANSCRIPT_TOKENS, encoding)[0]
+        messages = build_combine_messages(section_summaries, max_length)
+    
+    stream = client.chat.completions.create(
+        model=model,
+        messages=messages,
+        temperature=0.7,
+        stream=True
+    )
+    
+    for chunk in stream:
+        if chunk.choices:
+            yield chunk.choices[0].delta.content or ""
+
+@st.cache_data(show_spinner=False)
+def get_transcript_stats(text, preview_sentences=3):
+    """
+    Compute word/character counts and a short preview of a transcript.
+    
+    Counts words and pulls the leading sentences with iterators rather than
+    splitting the whole transcript into lists. Cached so switching tabs or
+    other reruns don't recompute it.
+    
+    Args:
+        text (str): Transcript text
+        preview_sentences (int): Number of leading sentences to return
+        
+    Returns:
+        tuple: (word count, character count, list of preview sentences)
+    """
+    word_count = sum(1 for _ in WORD_RE.finditer(text))
+    sentences = [
+        match.group(1).strip()
+        for match in itertools.islice(SENTENCE_RE.finditer(text), preview_sentences)
+    ]
+    return word_count, len(text), sentences
 
 def main():
     """
@@ -207,34 +775,42 @@ def main():
             api_key = stored_api_key
         else:
             api_key = st.text_input("OpenAI API Key:", type="password", help="Enter your OpenAI API key")
-            if api_key:
-                os.environ["OPENAI_API_KEY"] = api_key
         
         # Summary length
         summary_length = st.slider("Summary Length (words):", 100, 1000, 300, 50)
         
+        # Model selection
+        summary_model = st.selectbox("Summary Model:", SUMMARY_MODELS, help="gpt-4o gives higher quality summaries at higher latency and cost")
+        transcription_model = st.selectbox("Transcription Model:", TRANSCRIPTION_MODELS, help="Used only for videos without YouTube captions")
+        
+        # Bypass cached transcripts and summaries
+        force_refresh = st.checkbox("Force refresh", help="Ignore cached results and re-process the video")
+        
         # Audio quality info
-        st.info("🎵 **Audio Processing**\n\nThis app extracts audio from YouTube videos and transcribes it using OpenAI's Whisper model.")
+        st.info("🎵 **Audio Processing**\n\nThis app extracts audio from YouTube videos and transcribes it using OpenAI's speech-to-text models.")
     
     # Main content area
-    col1, col2 = st.columns([3, 1])
-    
-    with col1:
-        youtube_url = st.text_input(
-            "YouTube URL:",
-            placeholder="https://www.youtube.com/watch?v=...",
-            help="Paste any YouTube URL here"
-        )
-    
-    with col2:
-        process_button = st.button("🚀 Process Video", type="primary", use_container_width=True)
+    # A form batches the URL input with the button, so editing the URL does
+    # not rerun the app until the form is submitted
+    with st.form("video_form", border=False):
+        col1, col2 = st.columns([3, 1])
+        
+        with col1:
+            youtube_url = st.text_input(
+                "YouTube URL:",
+                placeholder="https://www.youtube.com/watch?v=...",
+                help="Paste any YouTube URL here"
+            )
+        
+        with col2:
+            process_button = st.form_submit_button("🚀 Process Video", type="primary", use_container_width=True)
     
     if process_button:
         if not youtube_url:
             st.error("Please enter a YouTube URL")
             return
         
-        if not api_key and not get_openai_api_key():
+        if not api_key:
             st.error("Please enter your OpenAI API Key in the sidebar")
             return
         
@@ -255,39 +831,90 @@ def main():
             st.write(f"**Video URL:** {youtube_url}")
             st.write("(Could not embed video preview)")
         
-        # Process audio and transcription
-        with st.spinner("🎵 Extracting audio from YouTube video..."):
-            audio_data = extract_audio_from_youtube(youtube_url)
-            
-            if not audio_data:
-                st.error("Could not extract audio from the video")
-                st.info("💡 **Possible reasons:**")
-                st.write("- Video is private or age-restricted")
-                st.write("- Video has been deleted")
-                st.write("- Network connection issues")
-                st.write("- Video format not supported")
-                return
-        
-        with st.spinner("🤖 Transcribing audio using OpenAI Whisper..."):
-            transcript_text = transcribe_audio(audio_data)
-            
-            if not transcript_text:
-                st.error("Could not transcribe audio")
-                return
+        cache = get_cache()
+        
+        # Reuse a cached transcript unless a refresh was requested. Caption
+        # transcripts don't depend on the model, audio transcripts do
+        transcript_text = None
+        transcript_model = None
+        if not force_refresh:
+            for model in (None, transcription_model):
+                transcript_text = cache.get(transcript_cache_key(video_id, model))
+                if transcript_text is not None:
+                    transcript_model = model
+                    break
+        transcript_cached = transcript_text is not None
+        video_info = None
+        
+        if transcript_text is None:
+            # Use YouTube captions when available to skip audio download and Whisper
+            with st.spinner("📜 Checking for YouTube captions..."):
+                transcript_text, video_info = get_youtube_captions(youtube_url)
+        
+        if transcript_text is None:
+            transcript_model = transcription_model
+            scratch_dir = get_scratch_dir()
+            try:
+                # Process audio and transcription in a single status container
+                with st.status("🎵 Extracting audio from YouTube video...", expanded=True) as status:
+                    download_progress = st.progress(0.0)
+                    audio_path = extract_audio_from_youtube(
+                        youtube_url,
+                        scratch_dir,
+                        progress_callback=download_progress.progress,
+                        info=video_info
+                    )
+                    
+                    if not audio_path:
+                        status.update(label="Could not extract audio from the video", state="error")
+                        st.error("Could not extract audio from the video")
+                        st.info("💡 **Possible reasons:**")
+                        st.write("- Video is private or age-restricted")
+                        st.write("- Video has been deleted")
+                        st.write("- Network connection issues")
+                        st.write("- Video format not supported")
+                        return
+                    
+                    status.update(label=f"🤖 Transcribing audio using {transcription_model}...")
+                    transcript_text = transcribe_audio(audio_path, api_key, transcription_model)
+                    
+                    if not transcript_text:
+                        status.update(label="Could not transcribe audio", state="error")
+                        st.error("Could not transcribe audio")
+                        return
+                    
+                    status.update(label="✅ Transcript ready", state="complete", expanded=False)
+            finally:
+                # Keep the directory for the next run but free the audio and its chunks
+                clear_scratch_dir(scratch_dir)
+        
+        if not transcript_cached:
+            cache.set(transcript_cache_key(video_id, transcript_model), transcript_text, expire=CACHE_TTL)
         
-        # Generate summary
-        with st.spinner("📝 Generating AI summary..."):
-            summary = summarize_text(transcript_text, summary_length)
+        summary_key = summary_cache_key(video_id, summary_length, summary_model, transcript_model)
         
         # Display results
-        st.success("✅ Processing complete!")
+        status_message = st.empty()
         
         # Create tabs for results
         tab1, tab2, tab3 = st.tabs(["📋 Summary", "📜 Full Transcript", "📊 Stats"])
         
         with tab1:
             st.subheader("AI Summary")
-            st.write(summary)
+            summary = None if force_refresh else cache.get(summary_key)
+            
+            if summary is None:
+                # Stream the summary so it renders as it is generated
+                try:
+                    summary = st.write_stream(summarize_text(transcript_text, api_key, summary_length, summary_model))
+                except Exception as e:
+                    st.error(f"Error summarizing text: {str(e)}")
+                    summary = None
+                
+                if summary:
+                    cache.set(summary_key, summary, expire=CACHE_TTL)
+            else:
+                st.write(summary)
             
             # Download summary
             if summary:
@@ -298,6 +925,8 @@ def main():
                     mime="text/plain"
                 )
         
+        status_message.success("✅ Processing complete!")
+        
         with tab2:
             st.subheader("Full Transcript")
             st.text_area("Transcript:", transcript_text, height=400)
@@ -312,8 +941,7 @@ def main():
         
         with tab3:
             st.subheader("Transcript Statistics")
-            word_count = len(transcript_text.split())
-            char_count = len(transcript_text)
+            word_count, char_count, sentences = get_transcript_stats(transcript_text)
             
             col1, col2, col3 = st.columns(3)
             with col1:
@@ -325,13 +953,12 @@ def main():
             
             # Show first few sentences
             st.subheader("Transcript Preview")
-            sentences = transcript_text.split('. ')[:3]
             for i, sentence in enumerate(sentences, 1):
-                st.write(f"**{i}.** {sentence.strip()}...")
+                st.write(f"**{i}.** {sentence}...")
     
     # Footer
     st.markdown("---")
-    st.markdown("**Note:** This app extracts audio from YouTube videos and uses OpenAI's Whisper for transcription and GPT for summarization.")
+    st.markdown("**Note:** This app extracts audio from YouTube videos and uses OpenAI's speech-to-text models for transcription and GPT for summarization.")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file